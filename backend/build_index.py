@@ -1,17 +1,18 @@
 import os
 import sys
+import argparse
 from dotenv import load_dotenv
 
 # Add current directory to path so imports work
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
-from rag_engine import RagEngine
+from rag_engine import RagEngine, SHARD_STRATEGIES, DEFAULT_NUM_SHARDS
 
 # Load env vars
 load_dotenv(os.path.join(os.path.dirname(current_dir), '.env'))
 
-def build():
+def build(shard_by=None, num_shards=None, rebuild_shard=None):
     print("Starting Index Build Process...")
     key = os.getenv("GEMINI_API_KEY")
     if not key:
@@ -23,10 +24,20 @@ def build():
         # We can force a rebuild if we want, but default logic builds if missing.
         # To force rebuild for this script, we can check arguments or just rely on manual deletion.
         # simpler: just init.
-        engine = RagEngine(gemini_api_key=key)
+        # With --rebuild-shard, don't build every shard first only to re-embed this one
+        engine = RagEngine(gemini_api_key=key, shard_by=shard_by, num_shards=num_shards, build_if_missing=not rebuild_shard)
+        if rebuild_shard:
+            # Only this shard is re-embedded; the others are left on disk untouched
+            engine.rebuild_shard(rebuild_shard)
         print("✅ Index built and saved successfully!")
     except Exception as e:
         print(f"❌ Error building index: {e}")
 
 if __name__ == "__main__":
-    build()
+    parser = argparse.ArgumentParser(description="Build the FAISS index for the RAG engine.")
+    parser.add_argument("--shard-by", choices=SHARD_STRATEGIES, default=None, help="Partition the corpus into shards by year or hash bucket")
+    parser.add_argument("--num-shards", type=int, default=None,
+                        help=f"Number of hash buckets (default: RAG_NUM_SHARDS, else the last built count, else {DEFAULT_NUM_SHARDS})")
+    parser.add_argument("--rebuild-shard", default=None, help="Rebuild only this shard, e.g. 2024 or unknown-003")
+    args = parser.parse_args()
+    build(shard_by=args.shard_by, num_shards=args.num_shards, rebuild_shard=args.rebuild_shard)
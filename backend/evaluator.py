@@ -1,5 +1,7 @@
+import io
 import os
-import json
+import re
+import math
 
 from langchain_groq import ChatGroq
 from langchain_core.prompts import PromptTemplate
@@ -7,7 +9,8 @@ from langchain_core.output_parsers import JsonOutputParser
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from rag_engine import RagEngine
-import PIL.Image
+from scoring import DEFAULT_WEIGHTS, DEFAULT_AI_WEIGHTS, compute_s_ai, compute_total
+from image_pipeline import VISION_MAX_SIDE, load_image, downscale_for_vision, tile_composite
 
 # Define Pydantic models for structured output
 class AISubs(BaseModel):
@@ -23,129 +26,294 @@ class GeneralScores(BaseModel):
     S_via: int = Field(description="Viability score (1-10)")
     reasoning: str = Field(description="Brief reasoning for these scores")
 
+class DesignScores(BaseModel):
+    tile_scores: List[float] = Field(description="Score 1-10 for each numbered screen, in order")
+    S_des: float = Field(description="Overall Design score (1-10)")
+    reasoning: str = Field(description="Brief critique of the screens")
+
+class ProjectAnalysis(BaseModel):
+    ai_scores: AISubs
+    general_scores: GeneralScores
+
+TEXT_MODEL = "llama-3.3-70b-versatile"
+# Using Llama 4 Scout (Vision/Multimodal)
+# Full ID required: meta-llama/llama-4-scout-17b-16e-instruct
+VISION_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+
+# --- PROMPT BUDGETING ---
+# Llama tokenizers average roughly 4 characters per token on English prose.
+# A character estimate keeps us free of a tokenizer dependency and is
+# deterministic, which is all the budget needs.
+CHARS_PER_TOKEN = 4
+DEFAULT_MAX_INPUT_TOKENS = 1500
+# The tech stack may use at most this share of the space left after the fixed
+# prompt; the description is always guaranteed MIN_DESCRIPTION_TOKENS.
+TECH_STACK_BUDGET_SHARE = 0.3
+MIN_DESCRIPTION_TOKENS = 200
+
+# Devpost-style section headers and footer lines that carry no signal for scoring
+BOILERPLATE_PATTERNS = [
+    re.compile(r"^#+\s*(inspiration|what it does|how we built it|challenges we ran into|"
+               r"accomplishments that we'?re proud of|what we learned|what'?s next.*)\s*$", re.IGNORECASE),
+    re.compile(r"^(built with|try it out|video demo|demo|github|devpost)\s*:?\s*$", re.IGNORECASE),
+    re.compile(r"^\s*(https?://\S+)\s*$"),
+]
+
+TEXT_AUDIT_PROMPT = """Analyze the following Hackathon Project.
+
+Project Description:
+{description}
+
+Tech Stack:
+{tech_stack}
+
+Task 1: Evaluate AI Implementation Details (0-5 scale each):
+- I_rag: Look for "Vector Store", "GraphRAG", "HyDE".
+- I_agent: Look for "ReAct", "LangGraph", "Tool Use".
+- I_ft: Look for "LoRA", "Fine-tuning", "Custom Model".
+- I_safety: Look for "Guardrails", "PII Masking".
+
+Task 2: Evaluate General Metrics (1-10 scale each):
+- S_tech: Technical Complexity.
+- S_imp: Impact.
+- S_via: Viability.
+
+Return a JSON object with strictly these keys:
+{{"ai_scores": {{"I_rag": <int>, "I_agent": <int>, "I_ft": <int>, "I_safety": <int>, "reasoning": "<string summary of AI scores>"}},
+"general_scores": {{"S_tech": <int>, "S_imp": <int>, "S_via": <int>, "reasoning": "<string summary of General scores>"}}}}
+"""
+
+DESIGN_PROMPT = """This image shows {count} numbered screen(s) of one app.
+Rate each screen (1-10) on hierarchy, accessibility, and polish, then give an overall score for the app.
+Return a JSON object with strictly these keys:
+{{"tile_scores": [<float per screen, in number order>], "S_des": <float>, "reasoning": "<string critique>"}}
+"""
+
+def estimate_tokens(text):
+    """
+    Approximate token count for budgeting prompts.
+    """
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def compact_tech_stack(tech_stack, max_tokens=None):
+    """
+    Splits the tech stack on common separators and drops duplicate entries
+    (case-insensitive), keeping first-seen order. With `max_tokens`, trailing
+    entries that don't fit are dropped.
+    Returns (compacted text, whether entries were dropped).
+    """
+    seen = set()
+    entries = []
+    for entry in re.split(r"[,;\n|]+", tech_stack or ""):
+        entry = entry.strip(" \t-*•")
+        key = entry.lower()
+        if entry and key not in seen:
+            seen.add(key)
+            entries.append(entry)
+
+    text = ", ".join(entries)
+    if max_tokens is None or estimate_tokens(text) <= max_tokens:
+        return text, False
+
+    max_chars = max(0, max_tokens) * CHARS_PER_TOKEN
+    kept = []
+    length = 0
+    for entry in entries:
+        added = len(entry) + (2 if kept else 0)
+        if length + added > max_chars:
+            break
+        kept.append(entry)
+        length += added
+    return ", ".join(kept), True
+
+def compact_description(description, max_tokens):
+    """
+    Strips boilerplate lines, collapses whitespace and truncates the description
+    to `max_tokens`, preferring to cut on a sentence boundary.
+    Returns (compacted text, whether it was truncated).
+    """
+    lines = []
+    for line in (description or "").splitlines():
+        line = " ".join(line.split())
+        if not line or any(p.match(line) for p in BOILERPLATE_PATTERNS):
+            continue
+        lines.append(line)
+    text = "\n".join(lines)
+
+    max_chars = max(0, max_tokens) * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text, False
+
+    truncated = text[:max_chars]
+    # Back off to the last sentence end if it doesn't throw away too much
+    cut = max(truncated.rfind(". "), truncated.rfind("\n"))
+    if cut > max_chars // 2:
+        truncated = truncated[:cut + 1]
+    return truncated.rstrip(), True
+
 import base64
 from langchain_core.messages import HumanMessage
 
+def evaluator_config(max_input_tokens=DEFAULT_MAX_INPUT_TOKENS, weights=DEFAULT_WEIGHTS, ai_weights=DEFAULT_AI_WEIGHTS):
+    """
+    Settings that determine an evaluation's scores. The history store folds
+    these into its reuse key, so results are only reused under the same config.
+    """
+    return {
+        "text_model": TEXT_MODEL,
+        "vision_model": VISION_MODEL,
+        "max_input_tokens": max_input_tokens,
+        "weights": dict(weights),
+        "ai_weights": dict(ai_weights)
+    }
+
 class Evaluator:
-    def __init__(self, groq_api_key):
+    def __init__(self, groq_api_key, max_input_tokens=DEFAULT_MAX_INPUT_TOKENS, shard_by=None, num_shards=None,
+                 weights=DEFAULT_WEIGHTS, ai_weights=DEFAULT_AI_WEIGHTS):
         # Gemini Key removed. RAG Engine now uses Local Embeddings, so no key needed there either.
-        self.rag_engine = RagEngine() 
+        self.rag_engine = RagEngine(shard_by=shard_by, num_shards=num_shards)
         self.groq_api_key = groq_api_key
+        self.weights = weights
+        self.ai_weights = ai_weights
         
         if not groq_api_key:
             raise ValueError("Groq API Key is required.")
 
+        fixed_tokens = estimate_tokens(TEXT_AUDIT_PROMPT.format(description="", tech_stack=""))
+        if max_input_tokens < fixed_tokens + MIN_DESCRIPTION_TOKENS:
+            raise ValueError(f"max_input_tokens must be at least {fixed_tokens + MIN_DESCRIPTION_TOKENS}.")
+
         # Initialize Groq for Text
-        self.llm = ChatGroq(model_name="llama-3.3-70b-versatile", temperature=0.0, groq_api_key=groq_api_key)
+        self.llm = ChatGroq(model_name=TEXT_MODEL, temperature=0.0, groq_api_key=groq_api_key)
+
+        # Structured output: Groq JSON mode, validated against ProjectAnalysis.
+        # include_raw returns parse errors instead of raising; API errors still raise.
+        self.text_auditor = self.llm.with_structured_output(ProjectAnalysis, method="json_mode", include_raw=True)
+        self.max_input_tokens = max_input_tokens
+        self.config = evaluator_config(max_input_tokens, weights, ai_weights)
+        self.text_audit_stats = {
+            "calls": 0, "parse_failures": 0, "truncations": 0,
+            "prompt_tokens": 0, "estimated_prompt_tokens": 0
+        }
         
-        # Initialize Groq for Vision
-        # Using Llama 4 Scout (Vision/Multimodal)
-        # Full ID required: meta-llama/llama-4-scout-17b-16e-instruct
-        self.vision_model = ChatGroq(model_name="meta-llama/llama-4-scout-17b-16e-instruct", temperature=0.0, groq_api_key=groq_api_key)
+        # Initialize Groq for Vision (VISION_MODEL)
+        self.vision_model = ChatGroq(model_name=VISION_MODEL, temperature=0.0, groq_api_key=groq_api_key)
+        self.design_auditor = self.vision_model.with_structured_output(DesignScores, method="json_mode", include_raw=True)
 
     def analyze_text_components(self, description, tech_stack):
         """
         Uses LLM to extract AI sub-scores and General scores.
+        Inputs are compacted to fit `max_input_tokens` and the reply is
+        requested in JSON mode and validated against `ProjectAnalysis`.
         """
-        prompt_text = f"""
-        Analyze the following Hackathon Project:
-        
-        Project Description:
-        {description}
-        
-        Tech Stack:
-        {tech_stack}
-        
-        ---
-        Task 1: Evaluate AI Implementation Details (0-5 scale each):
-        - I_rag: Look for "Vector Store", "GraphRAG", "HyDE".
-        - I_agent: Look for "ReAct", "LangGraph", "Tool Use".
-        - I_ft: Look for "LoRA", "Fine-tuning", "Custom Model".
-        - I_safety: Look for "Guardrails", "PII Masking".
-        
-        Task 2: Evaluate General Metrics (1-10 scale each):
-        - S_tech: Technical Complexity.
-        - S_imp: Impact.
-        - S_via: Viability.
-        
-        Return a JSON object with strictly these keys:
-        {{
-            "ai_scores": {{
-                "I_rag": <int>,
-                "I_agent": <int>,
-                "I_ft": <int>,
-                "I_safety": <int>,
-                "reasoning": "<string summary of AI scores>"
-            }},
-            "general_scores": {{
-                "S_tech": <int>,
-                "S_imp": <int>,
-                "S_via": <int>,
-                "reasoning": "<string summary of General scores>"
-            }}
-        }}
-        """
-        
-        response = self.llm.invoke(prompt_text)
-        content = response.content
-        
-        # Clean markdown code blocks if present
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0]
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0]
-            
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError as e:
-            # Fallback default
+        # Split what is left after the fixed prompt: the tech stack gets a capped
+        # share, the description gets the rest (never less than MIN_DESCRIPTION_TOKENS)
+        available = self.max_input_tokens - estimate_tokens(TEXT_AUDIT_PROMPT.format(description="", tech_stack=""))
+        tech_budget = min(int(available * TECH_STACK_BUDGET_SHARE), available - MIN_DESCRIPTION_TOKENS)
+        tech_stack, stack_truncated = compact_tech_stack(tech_stack, tech_budget)
+        description, desc_truncated = compact_description(description, available - estimate_tokens(tech_stack))
+
+        prompt_text = TEXT_AUDIT_PROMPT.format(description=description, tech_stack=tech_stack)
+        truncated = stack_truncated or desc_truncated
+
+        # Groq auth/rate-limit/network errors raise here and propagate to the caller;
+        # only a reply that fails JSON parsing or model validation falls back.
+        result = self.text_auditor.invoke(prompt_text)
+        parsed = result.get("parsed")
+
+        # Real prompt size as billed, falling back to the estimate if usage is missing
+        usage = getattr(result.get("raw"), "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens") or estimate_tokens(prompt_text)
+
+        stats = self.text_audit_stats
+        stats["calls"] += 1
+        stats["prompt_tokens"] += input_tokens
+        stats["estimated_prompt_tokens"] += estimate_tokens(prompt_text)
+        stats["truncations"] += int(truncated)
+        stats["parse_failures"] += int(parsed is None)
+        print(f"Text Audit: {input_tokens} input tokens (truncated={truncated}, parsed={parsed is not None}); "
+              f"totals: {stats['calls']} calls, {stats['parse_failures']} parse failures, "
+              f"{stats['truncations']} truncations, {stats['prompt_tokens']} input tokens")
+
+        if parsed is None:
+            print(f"Text Audit Parse Error: {result.get('parsing_error') or 'Empty structured response'}")
+            # Fallback default, flagged so it is never archived or reused
             return {
                 "ai_scores": {"I_rag": 0, "I_agent": 0, "I_ft": 0, "I_safety": 0, "reasoning": "Failed to parse"},
-                "general_scores": {"S_tech": 5, "S_imp": 5, "S_via": 5, "reasoning": "Failed to parse"}
+                "general_scores": {"S_tech": 5, "S_imp": 5, "S_via": 5, "reasoning": "Failed to parse"},
+                "parse_failed": True,
+                "truncated": truncated,
+                "input_tokens": input_tokens
             }
-            
-        return data
 
-    def analyze_design(self, image_path):
+        analysis = parsed.model_dump()
+        analysis["parse_failed"] = False
+        analysis["truncated"] = truncated
+        analysis["input_tokens"] = input_tokens
+        return analysis
+
+    def analyze_design(self, image_paths):
         """
-        Uses Groq (Llama 3.2 Vision) to analyze UI.
+        Uses Groq (Llama 4 Scout) to analyze UI.
+        Accepts one path or a list; multiple screenshots are tiled into one
+        composite so the whole app is reviewed in a single vision call.
+        Returns (overall score, reasoning, per-screen scores, scored). `scored` is False
+        when images were given but no real score came back (vision/API/decode error
+        or an unparseable reply), so callers can keep the fallback out of the archive.
         """
-        if not image_path:
-            return 5.0, "No image provided."
+        if isinstance(image_paths, str):
+            image_paths = [image_paths]
+        image_paths = [p for p in (image_paths or []) if p]
+        if not image_paths:
+            # Nothing to score; the neutral default is the intended result
+            return 5.0, "No image provided.", [], True
 
         try:
+            images = [load_image(p, draft_size=(VISION_MAX_SIDE, VISION_MAX_SIDE)) for p in image_paths]
+            if len(images) == 1:
+                composite = downscale_for_vision(images[0])
+            else:
+                composite = tile_composite(images)
+
             # Encode image to base64
-            def encode_image(image_path):
-                with open(image_path, "rb") as image_file:
-                    return base64.b64encode(image_file.read()).decode('utf-8')
-            
-            base64_image = encode_image(image_path)
-            
-            prompt = "Rate this UI (1-10) on hierarchy, accessibility, and polish. Return ONLY the number."
-            
+            buffer = io.BytesIO()
+            composite.save(buffer, "JPEG", quality=85)
+            base64_image = base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+            prompt = DESIGN_PROMPT.format(count=len(images))
+
             message = HumanMessage(
                 content=[
                     {"type": "text", "text": prompt},
                     {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{base64_image}"}},
                 ]
             )
-            
-            response = self.vision_model.invoke([message])
-            text = response.content.strip()
-            
-            # Extract number
-            import re
-            match = re.search(r'\d+(\.\d+)?', text)
-            if match:
-                score = float(match.group())
-                return min(10.0, max(1.0, score)), text
-            else:
-                return 5.0, "Could not extract score from Groq response: " + text
+
+            result = self.design_auditor.invoke([message])
+            parsed = result.get("parsed")
+            if parsed is None:
+                # Fall back to the first number in the raw reply, as a single overall score
+                text = result["raw"].content.strip()
+                match = re.search(r'\d+(\.\d+)?', text)
+                if not match:
+                    return 5.0, "Could not extract score from Groq response: " + text, [], False
+                # A guessed score: usable for display, not trustworthy enough to archive
+                score = min(10.0, max(1.0, float(match.group())))
+                return score, text, [score] * len(images), False
+
+            tile_scores = [min(10.0, max(1.0, float(t))) for t in parsed.tile_scores[:len(images)]]
+            score = min(10.0, max(1.0, parsed.S_des))
+            # Pad missing screens with the overall score so tiles line up with inputs
+            tile_scores += [score] * (len(images) - len(tile_scores))
+            return score, parsed.reasoning, tile_scores, True
         except Exception as e:
             print(f"Groq Vision Error: {e}")
-            return 5.0, f"Error analyzing image: {str(e)}"
+            return 5.0, f"Error analyzing image: {str(e)}", [], False
 
     def audit_project(self, description, tech_stack, image_path=None):
+        # image_path may be a single path or a list of screenshots
         # Step 1: Novelty (RAG)
         s_nov, similar_projects = self.rag_engine.calculate_novelty_score(description + " " + tech_stack)
         
@@ -163,20 +331,25 @@ class Evaluator:
         i_ft = ai_data.get("I_ft", 0)
         i_safety = ai_data.get("I_safety", 0)
         
-        raw_ai_sum = (0.25 * i_rag) + (0.25 * i_agent) + (0.25 * i_ft) + (0.25 * i_safety)
-        s_ai = raw_ai_sum * 2 # Scale to 10
+        s_ai = compute_s_ai(
+            {"I_rag": i_rag, "I_agent": i_agent, "I_ft": i_ft, "I_safety": i_safety},
+            self.ai_weights
+        ) # Scaled to 10
         
         # Step 3: Design (Vision)
-        s_des, des_reasoning = self.analyze_design(image_path)
+        s_des, des_reasoning, des_tiles, des_scored = self.analyze_design(image_path)
         
         # Step 4: General Scores
         s_tech = gen_data.get("S_tech", 5)
         s_imp = gen_data.get("S_imp", 5)
         s_via = gen_data.get("S_via", 5)
         
-        # Final Formula
+        # Final Formula (weights default to scoring.DEFAULT_WEIGHTS)
         # S_total = 0.2(S_nov) + 0.2(S_tech) + 0.2(S_imp) + 0.1(S_via) + 0.2(S_ai) + 0.1(S_des)
-        s_total = (0.2 * s_nov) + (0.2 * s_tech) + (0.2 * s_imp) + (0.1 * s_via) + (0.2 * s_ai) + (0.1 * s_des)
+        s_total = compute_total(
+            {"S_nov": s_nov, "S_tech": s_tech, "S_imp": s_imp, "S_via": s_via, "S_ai": s_ai, "S_des": s_des},
+            self.weights
+        )
         
         return {
             "S_total": round(s_total, 1),
@@ -194,6 +367,12 @@ class Evaluator:
                 "I_ft": i_ft,
                 "I_safety": i_safety
             },
+            "design_breakdown": des_tiles,
+            # Fallback text or design scores (unparseable reply, vision error);
+            # shown to the user but not saved to the history store
+            "degraded": analysis.get("parse_failed", False) or not des_scored,
+            "input_truncated": analysis.get("truncated", False),
+            "input_tokens": analysis.get("input_tokens"),
             "similar_projects": similar_projects,
             "reasoning": {
                 "ai": ai_data.get("reasoning", ""),
@@ -0,0 +1,253 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from contextlib import closing
+
+from image_pipeline import hash_file
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+HISTORY_DB_PATH = os.path.join(BASE_DIR, "data", "evaluations.db")
+
+DEFAULT_EVENT = "default"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event TEXT NOT NULL,
+    project_name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    s_total REAL NOT NULL,
+    s_nov REAL, s_tech REAL, s_imp REAL, s_via REAL, s_ai REAL, s_des REAL,
+    i_rag INTEGER, i_agent INTEGER, i_ft INTEGER, i_safety INTEGER,
+    input_hash TEXT NOT NULL,
+    description_hash TEXT NOT NULL,
+    tech_stack_hash TEXT NOT NULL,
+    image_hash TEXT,
+    similar_projects TEXT NOT NULL,
+    reasoning TEXT NOT NULL,
+    design_breakdown TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_evaluations_event ON evaluations (event);
+CREATE INDEX IF NOT EXISTS idx_evaluations_score ON evaluations (s_total DESC);
+CREATE INDEX IF NOT EXISTS idx_evaluations_created ON evaluations (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_evaluations_event_score ON evaluations (event, s_total DESC);
+CREATE INDEX IF NOT EXISTS idx_evaluations_event_created ON evaluations (event, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_evaluations_input ON evaluations (input_hash);
+"""
+
+# Columns returned by list queries; the JSON blobs are only loaded for single rows
+SUMMARY_COLUMNS = (
+    "id, event, project_name, created_at, s_total, "
+    "s_nov, s_tech, s_imp, s_via, s_ai, s_des, "
+    "i_rag, i_agent, i_ft, i_safety"
+)
+
+def hash_text(text):
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+def _hash_image(path):
+    if not path or not os.path.exists(path):
+        return None
+    return hash_file(path)
+
+def _as_float(value):
+    # Scores may arrive as NumPy scalars (e.g. np.float32 from FAISS), which
+    # sqlite3 would store as BLOBs; bind plain Python numbers instead.
+    return None if value is None else float(value)
+
+def _as_int(value):
+    return None if value is None else int(value)
+
+class HistoryStore:
+    """
+    Local SQLite store of completed evaluations.
+    Leaderboard and history views page through indexed columns, so they never touch the LLMs.
+    """
+    def __init__(self, db_path=HISTORY_DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # Archives created before per-screen design scores were stored lack the column
+            columns = {r["name"] for r in conn.execute("PRAGMA table_info(evaluations)")}
+            if "design_breakdown" not in columns:
+                conn.execute("ALTER TABLE evaluations ADD COLUMN design_breakdown TEXT NOT NULL DEFAULT '[]'")
+                conn.commit()
+
+    def _connect(self):
+        # A connection per call keeps the store safe across Streamlit's script threads
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def input_hashes(description, tech_stack, image_path=None, config=None):
+        """
+        Hashes of the inputs. `input_hash` (the reuse key) also covers `config`,
+        the `evaluator_config` that produced the scores.
+        """
+        description_hash = hash_text(description)
+        tech_stack_hash = hash_text(tech_stack)
+        # Multiple screenshots hash as one ordered set
+        if isinstance(image_path, (list, tuple)):
+            file_hashes = [h for h in (_hash_image(p) for p in image_path) if h]
+            if len(file_hashes) > 1:
+                image_hash = hash_text("|".join(file_hashes))
+            else:
+                image_hash = file_hashes[0] if file_hashes else None
+        else:
+            image_hash = _hash_image(image_path)
+        config_hash = hash_text(json.dumps(config, sort_keys=True)) if config else ""
+        input_hash = hash_text("|".join([description_hash, tech_stack_hash, image_hash or "", config_hash]))
+        return {
+            "input_hash": input_hash,
+            "description_hash": description_hash,
+            "tech_stack_hash": tech_stack_hash,
+            "image_hash": image_hash,
+        }
+
+    def save_evaluation(self, results, description, tech_stack, image_path=None, event=DEFAULT_EVENT, project_name="", config=None):
+        """
+        Persists an `Evaluator.audit_project` result. Returns the new row id, or None
+        for degraded results (fallback scores), which are never archived or reused.
+        """
+        if results.get("degraded"):
+            return None
+        hashes = self.input_hashes(description, tech_stack, image_path, config)
+        metrics = results.get("metrics", {})
+        ai = results.get("ai_breakdown", {})
+        row = {
+            "event": event or DEFAULT_EVENT,
+            "project_name": project_name or description.strip().split("\n")[0][:80],
+            "created_at": time.time(),
+            "s_total": float(results["S_total"]),
+            "s_nov": _as_float(metrics.get("S_nov")),
+            "s_tech": _as_float(metrics.get("S_tech")),
+            "s_imp": _as_float(metrics.get("S_imp")),
+            "s_via": _as_float(metrics.get("S_via")),
+            "s_ai": _as_float(metrics.get("S_ai")),
+            "s_des": _as_float(metrics.get("S_des")),
+            "i_rag": _as_int(ai.get("I_rag")),
+            "i_agent": _as_int(ai.get("I_agent")),
+            "i_ft": _as_int(ai.get("I_ft")),
+            "i_safety": _as_int(ai.get("I_safety")),
+            "similar_projects": json.dumps(results.get("similar_projects", []), default=float),
+            "reasoning": json.dumps(results.get("reasoning", {}), default=float),
+            "design_breakdown": json.dumps(results.get("design_breakdown", []), default=float),
+            **hashes,
+        }
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{key}" for key in row)
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(f"INSERT INTO evaluations ({columns}) VALUES ({placeholders})", row)
+            return cursor.lastrowid
+
+    def _page(self, order_by, event=None, page=1, page_size=25):
+        page = max(1, int(page))
+        where, params = "", []
+        if event:
+            where = "WHERE event = ?"
+            params.append(event)
+        params.extend([page_size, (page - 1) * page_size])
+        query = f"SELECT {SUMMARY_COLUMNS} FROM evaluations {where} ORDER BY {order_by} LIMIT ? OFFSET ?"
+        with closing(self._connect()) as conn:
+            return [dict(r) for r in conn.execute(query, params)]
+
+    def leaderboard(self, event=None, page=1, page_size=25):
+        """
+        Evaluations ranked by S_total (ties: most recent first).
+        """
+        return self._page("s_total DESC, created_at DESC", event, page, page_size)
+
+    def history(self, event=None, page=1, page_size=25):
+        """
+        Evaluations, most recent first.
+        """
+        return self._page("created_at DESC", event, page, page_size)
+
+    def score_rows(self, event=None):
+        """
+        Sub-scores of every evaluation (optionally for one event), for building a `ScoreMatrix`.
+        """
+        query = f"SELECT {SUMMARY_COLUMNS} FROM evaluations"
+        params = []
+        if event:
+            query += " WHERE event = ?"
+            params.append(event)
+        query += " ORDER BY id"
+        with closing(self._connect()) as conn:
+            return [dict(r) for r in conn.execute(query, params)]
+
+    def summaries(self, evaluation_ids):
+        """
+        Summary rows for the given ids (unordered).
+        """
+        if not evaluation_ids:
+            return []
+        placeholders = ", ".join("?" for _ in evaluation_ids)
+        query = f"SELECT {SUMMARY_COLUMNS} FROM evaluations WHERE id IN ({placeholders})"
+        with closing(self._connect()) as conn:
+            return [dict(r) for r in conn.execute(query, list(evaluation_ids))]
+
+    def count(self, event=None):
+        with closing(self._connect()) as conn:
+            if event:
+                return conn.execute("SELECT COUNT(*) FROM evaluations WHERE event = ?", (event,)).fetchone()[0]
+            return conn.execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+
+    def events(self):
+        with closing(self._connect()) as conn:
+            return [r[0] for r in conn.execute("SELECT DISTINCT event FROM evaluations ORDER BY event")]
+
+    def get_evaluation(self, evaluation_id):
+        """
+        Full stored evaluation in the same shape `audit_project` returns.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM evaluations WHERE id = ?", (evaluation_id,)).fetchone()
+        return self._to_result(row) if row else None
+
+    def find_by_inputs(self, description, tech_stack, image_path=None, event=None, config=None):
+        """
+        Most recent evaluation of identical inputs under the same evaluator `config`, or None.
+        """
+        input_hash = self.input_hashes(description, tech_stack, image_path, config)["input_hash"]
+        query = "SELECT * FROM evaluations WHERE input_hash = ?"
+        params = [input_hash]
+        if event:
+            query += " AND event = ?"
+            params.append(event)
+        query += " ORDER BY created_at DESC LIMIT 1"
+        with closing(self._connect()) as conn:
+            row = conn.execute(query, params).fetchone()
+        return self._to_result(row) if row else None
+
+    @staticmethod
+    def _to_result(row):
+        return {
+            "id": row["id"],
+            "event": row["event"],
+            "project_name": row["project_name"],
+            "created_at": row["created_at"],
+            "S_total": row["s_total"],
+            "metrics": {
+                "S_nov": row["s_nov"],
+                "S_tech": row["s_tech"],
+                "S_imp": row["s_imp"],
+                "S_via": row["s_via"],
+                "S_ai": row["s_ai"],
+                "S_des": row["s_des"]
+            },
+            "ai_breakdown": {
+                "I_rag": row["i_rag"],
+                "I_agent": row["i_agent"],
+                "I_ft": row["i_ft"],
+                "I_safety": row["i_safety"]
+            },
+            "design_breakdown": json.loads(row["design_breakdown"]),
+            "similar_projects": json.loads(row["similar_projects"]),
+            "reasoning": json.loads(row["reasoning"])
+        }
@@ -0,0 +1,292 @@
+import os
+import sys
+import json
+import math
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import PIL.Image
+import PIL.ImageFilter
+import PIL.ImageOps
+import PIL.ImageDraw
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif")
+MANIFEST_NAME = "manifest.json"
+# Completed results are flushed to the manifest this often, so an
+# interrupted run keeps its finished work
+MANIFEST_SAVE_EVERY = 50
+
+# Llama 4 Scout works on 336px tiles; 1344 = 4 tiles per side keeps detail
+# without sending pixels the model will downsample anyway.
+VISION_MAX_SIDE = 1344
+THUMBNAIL_WIDTH = 600
+THUMBNAIL_RATIO = (3, 2)
+
+# --- PRIMITIVES (shared by create_thumbnail.py, process_logo.py and the Evaluator) ---
+
+def load_image(path, mode="RGB", draft_size=None):
+    """
+    Opens an image, applies EXIF orientation and converts to `mode`.
+    `draft_size` lets the JPEG decoder downscale while decoding, which is
+    much cheaper than decoding at full size and resizing afterwards.
+    """
+    img = PIL.Image.open(path)
+    if draft_size and img.format == "JPEG":
+        img.draft("RGB", draft_size)
+    img = PIL.ImageOps.exif_transpose(img)
+    return img.convert(mode)
+
+def cover_crop(img, size):
+    """
+    Resizes `img` to cover `size` (aspect fill) and center crops to it.
+    """
+    scale = max(size[0] / img.width, size[1] / img.height)
+    scaled_size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+    scaled = img.resize(scaled_size, PIL.Image.Resampling.LANCZOS)
+
+    left = (scaled.width - size[0]) // 2
+    top = (scaled.height - size[1]) // 2
+    return scaled.crop((left, top, left + size[0], top + size[1]))
+
+def fit_within(img, max_size):
+    """
+    Resizes `img` to fit inside `max_size` keeping aspect ratio (may upscale).
+    """
+    scale = min(max_size[0] / img.width, max_size[1] / img.height)
+    new_size = (max(1, int(img.width * scale)), max(1, int(img.height * scale)))
+    return img.resize(new_size, PIL.Image.Resampling.LANCZOS)
+
+def blur_fill_composite(img, size, padding=50, blur_radius=20, shadow_offset=10):
+    """
+    Centers `img` on a blurred, cover-cropped copy of itself with a drop shadow.
+    """
+    background = cover_crop(img.convert("RGB"), size)
+    background = background.filter(PIL.ImageFilter.GaussianBlur(radius=blur_radius))
+
+    foreground = fit_within(img, (size[0] - padding * 2, size[1] - padding * 2))
+    fg_x = (size[0] - foreground.width) // 2
+    fg_y = (size[1] - foreground.height) // 2
+
+    if shadow_offset:
+        shadow = PIL.Image.new("RGBA", foreground.size, (0, 0, 0, 100))
+        background.paste(shadow, (fg_x + shadow_offset, fg_y + shadow_offset), shadow)
+
+    background.paste(foreground, (fg_x, fg_y))
+    return background
+
+def downscale_for_vision(img, max_side=VISION_MAX_SIDE):
+    """
+    Shrinks `img` so its longest side is at most `max_side`. Never upscales.
+    """
+    img = img.copy()
+    img.thumbnail((max_side, max_side), PIL.Image.Resampling.LANCZOS, reducing_gap=3.0)
+    return img
+
+def tile_composite(images, max_side=VISION_MAX_SIDE, gap=8, label=True):
+    """
+    Tiles `images` into a near-square grid that fits in `max_side` x `max_side`.
+    Each cell is blur-filled like create_thumbnail.py so every screen keeps its
+    aspect ratio, and is labelled with its 1-based index for the model to reference.
+    """
+    count = len(images)
+    cols = math.ceil(math.sqrt(count))
+    rows = math.ceil(count / cols)
+    cell_w = (max_side - gap * (cols - 1)) // cols
+    cell_h = (max_side - gap * (rows - 1)) // rows
+    # Keep the grid no taller than needed for landscape-ish screenshots
+    cell_h = min(cell_h, cell_w)
+
+    canvas = PIL.Image.new("RGB", (cols * cell_w + gap * (cols - 1), rows * cell_h + gap * (rows - 1)), (0, 0, 0))
+    draw = PIL.ImageDraw.Draw(canvas)
+    padding = max(1, min(cell_w, cell_h) // 30)
+    for i, img in enumerate(images):
+        cell = blur_fill_composite(img, (cell_w, cell_h), padding=padding, blur_radius=max(1, padding // 2), shadow_offset=0)
+        x = (i % cols) * (cell_w + gap)
+        y = (i // cols) * (cell_h + gap)
+        canvas.paste(cell, (x, y))
+        if label:
+            box_size = max(16, cell_h // 12)
+            draw.rectangle((x, y, x + box_size, y + box_size), fill=(0, 0, 0))
+            draw.text((x + box_size // 4, y + box_size // 6), str(i + 1), fill=(255, 255, 255), font_size=box_size * 2 // 3)
+    return canvas
+
+def thumbnail_size(width=THUMBNAIL_WIDTH, ratio=THUMBNAIL_RATIO):
+    return (width, int(width * ratio[1] / ratio[0]))
+
+# --- BATCH PIPELINE ---
+
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def project_id_for(path):
+    """
+    Output/manifest key for a screenshot: the file name including its extension,
+    so `a.png` and `a.jpg` never overwrite each other.
+    """
+    return os.path.basename(path)
+
+def output_paths(output_dir, project_id):
+    return (
+        os.path.join(output_dir, f"{project_id}.vision.jpg"),
+        os.path.join(output_dir, f"{project_id}.thumb.jpg"),
+    )
+
+def process_image(input_path, output_dir, vision_max_side=VISION_MAX_SIDE, thumb_width=THUMBNAIL_WIDTH):
+    """
+    Produces the vision-ready image and the display thumbnail for one screenshot.
+    Runs in a worker process, so it only takes and returns plain data.
+    """
+    project_id = project_id_for(input_path)
+    vision_path, thumb_path = output_paths(output_dir, project_id)
+    try:
+        img = load_image(input_path, draft_size=(vision_max_side, vision_max_side))
+        vision_img = downscale_for_vision(img, vision_max_side)
+        vision_img.save(vision_path, "JPEG", quality=85)
+
+        # Build the thumbnail from the already downscaled image; it is far smaller
+        # than the thumbnail's blur/resize work would need from the original.
+        size = thumbnail_size(thumb_width)
+        scale = thumb_width / 1500  # create_thumbnail.py defaults are tuned for 1500px
+        thumb = blur_fill_composite(
+            vision_img, size,
+            padding=max(1, int(50 * scale)),
+            blur_radius=max(1, int(20 * scale)),
+            shadow_offset=max(1, int(10 * scale)),
+        )
+        thumb.save(thumb_path, "JPEG", quality=90)
+        return {"project_id": project_id, "vision": vision_path, "thumbnail": thumb_path, "error": None}
+    except Exception as e:
+        return {"project_id": project_id, "vision": None, "thumbnail": None, "error": str(e)}
+
+def _remove_outputs(output_dir, project_id):
+    for path in output_paths(output_dir, project_id):
+        if os.path.exists(path):
+            os.remove(path)
+
+def _load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            print(f"Ignoring unreadable manifest at {path}")
+    return {}
+
+def _save_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def process_directory(input_dir, output_dir, workers=None, vision_max_side=VISION_MAX_SIDE, thumb_width=THUMBNAIL_WIDTH):
+    """
+    Normalizes every screenshot in `input_dir` on a process pool.
+    Files whose content hash and output sizes match the manifest (and whose outputs exist) are skipped.
+    Returns a summary dict with per-image results and throughput.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = _load_manifest(output_dir)
+
+    start = time.perf_counter()
+    pending = []
+    hashes = {}
+    seen = set()
+    skipped = 0
+    for name in sorted(os.listdir(input_dir)):
+        input_path = os.path.join(input_dir, name)
+        if not name.lower().endswith(IMAGE_EXTENSIONS) or not os.path.isfile(input_path):
+            continue
+
+        file_hash = hash_file(input_path)
+        project_id = project_id_for(input_path)
+        seen.add(project_id)
+        entry = manifest.get(project_id)
+        # Outputs are only reusable if both the content and the output sizes match
+        if (entry and entry.get("hash") == file_hash
+                and entry.get("vision_max_side") == vision_max_side
+                and entry.get("thumb_width") == thumb_width
+                and all(os.path.exists(p) for p in output_paths(output_dir, project_id))):
+            skipped += 1
+            continue
+
+        # Invalidate the old entry up front; it is only restored on success
+        manifest.pop(project_id, None)
+        hashes[project_id] = file_hash
+        pending.append(input_path)
+
+    # Inputs that were deleted since the last run lose their entry and outputs
+    for project_id in [pid for pid in manifest if pid not in seen]:
+        del manifest[project_id]
+        _remove_outputs(output_dir, project_id)
+    _save_manifest(output_dir, manifest)
+
+    results = []
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        chunksize = max(1, len(pending) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(
+                process_image,
+                pending,
+                [output_dir] * len(pending),
+                [vision_max_side] * len(pending),
+                [thumb_width] * len(pending),
+                chunksize=chunksize,
+            ):
+                results.append(result)
+                if result["error"] is None:
+                    manifest[result["project_id"]] = {
+                        "hash": hashes[result["project_id"]],
+                        "vision_max_side": vision_max_side,
+                        "thumb_width": thumb_width,
+                        "vision": os.path.basename(result["vision"]),
+                        "thumbnail": os.path.basename(result["thumbnail"]),
+                    }
+                else:
+                    # Don't leave stale or half-written images for changed content
+                    _remove_outputs(output_dir, result["project_id"])
+                if len(results) % MANIFEST_SAVE_EVERY == 0:
+                    _save_manifest(output_dir, manifest)
+    _save_manifest(output_dir, manifest)
+
+    elapsed = time.perf_counter() - start
+    processed = sum(1 for r in results if r["error"] is None)
+    return {
+        "processed": processed,
+        "skipped": skipped,
+        "failed": [r for r in results if r["error"] is not None],
+        "elapsed": elapsed,
+        "images_per_second": processed / elapsed if elapsed > 0 else 0.0,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-normalize project screenshots for judging.")
+    parser.add_argument("input_dir")
+    parser.add_argument("output_dir")
+    parser.add_argument("--workers", type=int, default=None, help="Process pool size (default: all cores)")
+    parser.add_argument("--vision-max-side", type=int, default=VISION_MAX_SIDE)
+    parser.add_argument("--thumb-width", type=int, default=THUMBNAIL_WIDTH)
+    args = parser.parse_args(argv)
+
+    summary = process_directory(
+        args.input_dir, args.output_dir,
+        workers=args.workers,
+        vision_max_side=args.vision_max_side,
+        thumb_width=args.thumb_width,
+    )
+    print(f"Processed {summary['processed']} images, skipped {summary['skipped']} unchanged "
+          f"in {summary['elapsed']:.2f}s ({summary['images_per_second']:.1f} images/sec)")
+    for failure in summary["failed"]:
+        print(f"❌ {failure['project_id']}: {failure['error']}")
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
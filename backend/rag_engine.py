@@ -1,4 +1,10 @@
 import os
+import json
+import heapq
+import hashlib
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import HuggingFaceEmbeddings
@@ -10,11 +16,49 @@ load_dotenv()
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, "data", "hackathon_projects_merged.csv")
 INDEX_PATH = os.path.join(BASE_DIR, "faiss_index")
+SHARDS_PATH = os.path.join(BASE_DIR, "faiss_shards")
+
+SHARD_STRATEGIES = ("year", "hash")
+DEFAULT_NUM_SHARDS = 8
+
+def load_documents():
+    """
+    Reads the hackathon CSV into LangChain Documents.
+    """
+    if not os.path.exists(DATA_PATH):
+        raise FileNotFoundError(f"Data file not found at {DATA_PATH}")
+
+    df = pd.read_csv(DATA_PATH)
+    df = df.fillna("")
+
+    documents = []
+    for _, row in df.iterrows():
+        page_content = f"Title: {row['title']}\nDescription: {row['description']}\nTech Stack: {row['tech_stack']}"
+        metadata = {
+            "title": row['title'],
+            "description": row['description'],
+            "tech_stack": row['tech_stack'],
+            "is_winner": row.get('is_winner', False),
+            "url": row.get('url', ''),
+            "year": row.get('year', '')
+        }
+        documents.append(Document(page_content=page_content, metadata=metadata))
+    return documents
 
 class RagEngine:
-    def __init__(self, gemini_api_key=None):
+    def __init__(self, gemini_api_key=None, shard_by=None, num_shards=None, max_workers=None, build_if_missing=True):
         # API key is no longer needed for embeddings, but we keep signature compatible
         self.api_key = gemini_api_key 
+
+        # Sharding: None keeps the single FAISS index; "year" or "hash" partitions the corpus
+        shard_by = shard_by or os.getenv("RAG_SHARD_BY") or None
+        if shard_by is not None and shard_by not in SHARD_STRATEGIES:
+            raise ValueError(f"shard_by must be one of {SHARD_STRATEGIES} or None, got {shard_by!r}")
+        self.shard_by = shard_by
+        self.num_shards = self._resolve_num_shards(num_shards) if shard_by else None
+        self.max_workers = max_workers
+        self.shards = None
+        self._pool = None
         
         # Use Local Embeddings (Free, Fast, No Rate Limits)
         # all-MiniLM-L6-v2 is a standard efficient model.
@@ -25,7 +69,11 @@ class RagEngine:
             print(f"Error initializing HuggingFaceEmbeddings: {e}")
             raise e
             
-        self.vector_store = self._load_or_create_index()
+        if self.shard_by:
+            self.vector_store = None
+            self.shards = self._load_or_create_shards(build_if_missing)
+        else:
+            self.vector_store = self._load_or_create_index()
 
     def _load_or_create_index(self):
         """
@@ -46,24 +94,16 @@ class RagEngine:
                 print("Rebuilding index...")
         
         print(f"Building new FAISS index from {DATA_PATH}...")
-        if not os.path.exists(DATA_PATH):
-            raise FileNotFoundError(f"Data file not found at {DATA_PATH}")
-
-        df = pd.read_csv(DATA_PATH)
-        df = df.fillna("")
-
-        documents = []
-        for _, row in df.iterrows():
-            page_content = f"Title: {row['title']}\nDescription: {row['description']}\nTech Stack: {row['tech_stack']}"
-            metadata = {
-                "title": row['title'],
-                "description": row['description'],
-                "tech_stack": row['tech_stack'],
-                "is_winner": row.get('is_winner', False),
-                "url": row.get('url', '')
-            }
-            documents.append(Document(page_content=page_content, metadata=metadata))
+        vector_store = self._embed_documents(load_documents())
 
+        if vector_store:
+            vector_store.save_local(INDEX_PATH)
+        return vector_store
+
+    def _embed_documents(self, documents):
+        """
+        Embeds `documents` into a new FAISS store in batches.
+        """
         # Local processing is fast, we can enable a larger batch size
         batch_size = 500 
         vector_store = None
@@ -83,15 +123,165 @@ class RagEngine:
             except Exception as e:
                 print(f"Error processing batch {i}: {e}")
 
-        if vector_store:
-            vector_store.save_local(INDEX_PATH)
         return vector_store
 
+    # --- SHARDING ---
+
+    def _layout_path(self):
+        return os.path.join(SHARDS_PATH, f"{self.shard_by}.json")
+
+    def _resolve_num_shards(self, num_shards):
+        """
+        Shard count: explicit argument, then RAG_NUM_SHARDS, then the count the
+        shards were last built with (recorded next to them), then the default.
+        """
+        if num_shards:
+            return int(num_shards)
+        if os.getenv("RAG_NUM_SHARDS"):
+            return int(os.getenv("RAG_NUM_SHARDS"))
+        try:
+            with open(self._layout_path()) as f:
+                return int(json.load(f)["num_shards"])
+        except (OSError, ValueError, KeyError):
+            return DEFAULT_NUM_SHARDS
+
+    def _record_layout(self):
+        os.makedirs(SHARDS_PATH, exist_ok=True)
+        with open(self._layout_path(), "w") as f:
+            json.dump({"shard_by": self.shard_by, "num_shards": self.num_shards}, f)
+
+    def _shards_dir(self):
+        # Bucket membership depends on the shard count (hash buckets, and the
+        # unknown-NNN buckets in year mode), so each count gets its own directory
+        return os.path.join(SHARDS_PATH, f"{self.shard_by}_{self.num_shards}")
+
+    def shard_key(self, metadata):
+        """
+        Shard a project belongs to: its year, or a stable hash bucket of title + url.
+        Projects without a year are spread over "unknown-NNN" hash buckets, since most
+        of the dataset has no year and a single "unknown" shard would hold nearly all of it.
+        """
+        digest = hashlib.md5(f"{metadata.get('title', '')}|{metadata.get('url', '')}".encode("utf-8")).hexdigest()
+        bucket = f"{int(digest, 16) % self.num_shards:03d}"
+        if self.shard_by == "year":
+            # CSV years may come through as floats ("2024.0") or be missing
+            year = str(metadata.get("year", "")).split(".")[0].strip()
+            return year or f"unknown-{bucket}"
+        return bucket
+
+    def _partition(self, documents):
+        partitions = {}
+        for doc in documents:
+            partitions.setdefault(self.shard_key(doc.metadata), []).append(doc)
+        return partitions
+
+    def _load_or_create_shards(self, build_if_missing=True):
+        """
+        Loads every shard under faiss_shards/, building them all from the CSV if none exist
+        (unless `build_if_missing` is False).
+        """
+        shards_dir = self._shards_dir()
+        shards = {}
+        if os.path.isdir(shards_dir):
+            for key in sorted(os.listdir(shards_dir)):
+                try:
+                    shards[key] = FAISS.load_local(os.path.join(shards_dir, key), self.embeddings, allow_dangerous_deserialization=True)
+                except Exception as e:
+                    print(f"Failed to load shard {key}: {e}")
+
+        if not shards and build_if_missing:
+            print(f"Building {self.shard_by}-sharded FAISS indices from {DATA_PATH}...")
+            for key, documents in sorted(self._partition(load_documents()).items()):
+                store = self._build_shard(key, documents)
+                if store:
+                    shards[key] = store
+
+        print(f"Loaded {len(shards)} shards from {shards_dir}")
+        return shards
+
+    def _build_shard(self, key, documents):
+        print(f"Building shard {key} ({len(documents)} documents)...")
+        store = self._embed_documents(documents)
+        if store:
+            store.save_local(os.path.join(self._shards_dir(), key))
+            self._record_layout()
+        return store
+
+    def rebuild_shard(self, key):
+        """
+        Rebuilds a single shard from the CSV without touching the others.
+        """
+        if not self.shard_by:
+            raise ValueError("rebuild_shard requires a sharded RagEngine")
+        documents = self._partition(load_documents()).get(key, [])
+        if not documents:
+            raise ValueError(f"No documents in the dataset map to shard {key!r}")
+        store = self._build_shard(key, documents)
+        if store is None:
+            raise RuntimeError(f"Failed to embed any documents for shard {key!r}")
+        self.shards[key] = store
+        self._reset_pool()
+        return store
+
+    def add_documents(self, documents):
+        """
+        Incrementally adds documents, updating and saving only the affected shards.
+        """
+        if not self.shard_by:
+            self.vector_store.add_documents(documents)
+            self.vector_store.save_local(INDEX_PATH)
+            return
+
+        for key, batch in self._partition(documents).items():
+            if key in self.shards:
+                self.shards[key].add_documents(batch)
+                self.shards[key].save_local(os.path.join(self._shards_dir(), key))
+            else:
+                store = self._build_shard(key, batch)
+                if store is None:
+                    raise RuntimeError(f"Failed to embed any documents for new shard {key!r}")
+                self.shards[key] = store
+        self._reset_pool()
+
+    def _reset_pool(self):
+        # Shard count may have changed; size the pool again on the next query.
+        # wait=False lets in-flight searches finish while the idle threads exit.
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _search_shard(self, store, embedding, k):
+        results = store.similarity_search_with_score_by_vector(embedding, k=k)
+        relevance_fn = store._select_relevance_score_fn()
+        return [(doc, relevance_fn(score)) for doc, score in results]
+
+    def similarity_search(self, idea_text, k=5):
+        """
+        Top-k (Document, relevance) pairs. With shards, the query is embedded once,
+        searched on every shard in parallel and the per-shard results merged with a heap.
+        """
+        if not self.shard_by:
+            if not self.vector_store:
+                return []
+            return self.vector_store.similarity_search_with_relevance_scores(idea_text, k=k)
+
+        if not self.shards:
+            return []
+
+        if self._pool is None:
+            # FAISS releases the GIL during search, so threads use every core
+            workers = self.max_workers or min(len(self.shards), os.cpu_count() or 1)
+            self._pool = ThreadPoolExecutor(max_workers=workers)
+
+        embedding = self.embeddings.embed_query(idea_text)
+        per_shard = self._pool.map(lambda store: self._search_shard(store, embedding, k), list(self.shards.values()))
+        return heapq.nlargest(k, itertools.chain.from_iterable(per_shard), key=lambda result: result[1])
+
     def calculate_novelty_score(self, idea_text):
-        if not self.vector_store:
+        if not self.vector_store and not self.shards:
              return 5.0, []
 
-        results = self.vector_store.similarity_search_with_relevance_scores(idea_text, k=5)
+        results = self.similarity_search(idea_text, k=5)
         
         max_similarity_score = 0.0
         similar_projects = []
@@ -0,0 +1,91 @@
+import numpy as np
+
+# Column order of the score matrix
+METRIC_KEYS = ("S_nov", "S_tech", "S_imp", "S_via", "S_ai", "S_des")
+AI_KEYS = ("I_rag", "I_agent", "I_ft", "I_safety")
+
+# S_total = 0.2(S_nov) + 0.2(S_tech) + 0.2(S_imp) + 0.1(S_via) + 0.2(S_ai) + 0.1(S_des)
+DEFAULT_WEIGHTS = {"S_nov": 0.2, "S_tech": 0.2, "S_imp": 0.2, "S_via": 0.1, "S_ai": 0.2, "S_des": 0.1}
+# S_ai = 0.25(I_rag) + 0.25(I_agent) + 0.25(I_ft) + 0.25(I_safety), on 0-5
+DEFAULT_AI_WEIGHTS = {"I_rag": 0.25, "I_agent": 0.25, "I_ft": 0.25, "I_safety": 0.25}
+# AI sub-scores are 0-5; S_ai is reported on 0-10
+AI_SCALE = 2
+
+def weight_vector(weights, keys):
+    """
+    Orders a weight dict by `keys` and normalizes it to sum to 1,
+    so totals stay on the same scale as the sub-scores. Weights that already
+    sum to 1 (within float tolerance, e.g. DEFAULT_WEIGHTS) are used as given.
+    """
+    vector = np.array([float(weights.get(key, 0.0)) for key in keys])
+    if (vector < 0).any():
+        raise ValueError("Weights must be non-negative")
+    total = vector.sum()
+    if total == 0:
+        raise ValueError("At least one weight must be positive")
+    if np.isclose(total, 1.0):
+        return vector
+    return vector / total
+
+def _weighted_sum(values, weights, keys):
+    # Left-to-right Python sum in key order, so default weights reproduce the
+    # original hand-written formulas bit for bit (a dot product may not).
+    vector = weight_vector(weights, keys)
+    total = 0.0
+    for key, weight in zip(keys, vector):
+        total += float(weight) * float(values.get(key, 0))
+    return total
+
+def compute_s_ai(ai_breakdown, ai_weights=DEFAULT_AI_WEIGHTS):
+    return _weighted_sum(ai_breakdown, ai_weights, AI_KEYS) * AI_SCALE
+
+def compute_total(metrics, weights=DEFAULT_WEIGHTS):
+    return _weighted_sum(metrics, weights, METRIC_KEYS)
+
+class ScoreMatrix:
+    """
+    Raw sub-scores of many evaluations as NumPy arrays, so totals and rankings
+    for any weighting are one matrix-vector product instead of new LLM calls.
+    """
+    def __init__(self, ids, metrics, ai, labels=None):
+        self.ids = np.asarray(ids)
+        self.metrics = np.asarray(metrics, dtype=float).reshape(-1, len(METRIC_KEYS))
+        self.ai = np.asarray(ai, dtype=float).reshape(-1, len(AI_KEYS))
+        self.labels = list(labels) if labels is not None else [str(i) for i in self.ids]
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds the matrix from `HistoryStore` summary rows (lower-case column names).
+        Missing sub-scores count as 0.
+        """
+        ids = [row["id"] for row in rows]
+        labels = [row.get("project_name", "") for row in rows]
+        metrics = [[row.get(key.lower()) or 0.0 for key in METRIC_KEYS] for row in rows]
+        ai = [[row.get(key.lower()) or 0.0 for key in AI_KEYS] for row in rows]
+        return cls(ids, metrics, ai, labels)
+
+    def totals(self, weights=DEFAULT_WEIGHTS, ai_weights=None):
+        """
+        S_total for every evaluation. If `ai_weights` is given, the S_ai column is
+        first recomputed from the I_* sub-scores; otherwise the stored S_ai is used.
+        """
+        metrics = self.metrics
+        if ai_weights is not None:
+            metrics = metrics.copy()
+            metrics[:, METRIC_KEYS.index("S_ai")] = self.ai @ weight_vector(ai_weights, AI_KEYS) * AI_SCALE
+        return metrics @ weight_vector(weights, METRIC_KEYS)
+
+    def rank(self, weights=DEFAULT_WEIGHTS, ai_weights=None, top=None):
+        """
+        Returns (order, totals): row indices sorted by descending S_total and the
+        totals themselves. Ties keep their input order.
+        """
+        totals = self.totals(weights, ai_weights)
+        order = np.argsort(-totals, kind="stable")
+        if top is not None:
+            order = order[:top]
+        return order, totals
@@ -7,7 +7,9 @@ import sys
 # Add backend to path to allow imports
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'backend')))
 
-from evaluator import Evaluator
+from evaluator import Evaluator, DEFAULT_MAX_INPUT_TOKENS, evaluator_config
+from history_store import HistoryStore, DEFAULT_EVENT
+from scoring import ScoreMatrix, METRIC_KEYS, AI_KEYS, DEFAULT_WEIGHTS, DEFAULT_AI_WEIGHTS
 
 from dotenv import load_dotenv
 
@@ -217,20 +219,28 @@ col1, col2 = st.columns([1, 1])
 
 with col1:
     st.subheader("INPUT_DATA_STREAM")
+    project_name = st.text_input("Project Name", placeholder="Designation...")
+    event_name = st.text_input("Event", value=DEFAULT_EVENT, help="Evaluations are archived and ranked per event")
     project_desc = st.text_area("Project Description", height=200, placeholder="Initialize project parameters...")
     tech_stack = st.text_area("Tech Stack", height=100, placeholder="Define system dependencies...")
 
 with col2:
     st.subheader("VISUAL_INPUT")
-    uploaded_file = st.file_uploader("Upload Interface", type=["jpg", "jpeg", "png"])
-    if uploaded_file:
-        st.image(uploaded_file, caption="Visual Data Received", use_column_width=True)
-        # Save temp file for evaluator
-        with open("temp_image.png", "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        image_path = "temp_image.png"
-    else:
-        image_path = None
+    uploaded_files = st.file_uploader("Upload Interface", type=["jpg", "jpeg", "png"], accept_multiple_files=True, help="Multiple screens are reviewed together in one vision call")
+    image_paths = []
+    if uploaded_files:
+        st.image(uploaded_files, caption=[f"Screen {i+1}" for i in range(len(uploaded_files))], width=160)
+        # Save temp files for evaluator
+        for i, uploaded_file in enumerate(uploaded_files):
+            temp_path = f"temp_image_{i}.png"
+            with open(temp_path, "wb") as f:
+                f.write(uploaded_file.getbuffer())
+            image_paths.append(temp_path)
+
+# Prompt budget for the text audit; see Evaluator / DEFAULT_MAX_INPUT_TOKENS
+max_input_tokens = int(os.getenv("MAX_INPUT_TOKENS", DEFAULT_MAX_INPUT_TOKENS))
+# Same settings the evaluator scores with; archived results are only reused under them
+eval_config = evaluator_config(max_input_tokens)
 
 @st.cache_resource
 def get_evaluator(groq_key):
@@ -238,10 +248,17 @@ def get_evaluator(groq_key):
         st.write("🔌 Connecting to Groq Inference Engine...")
         st.write("👁️  Calibrating Groq Vision Models...")
         st.write("📂 Loading Vector Database Indices...")
-        evaluator = Evaluator(groq_api_key=groq_key)
+        evaluator = Evaluator(groq_api_key=groq_key, max_input_tokens=max_input_tokens)
         status.update(label="SYSTEMS ONLINE", state="complete", expanded=False)
     return evaluator
 
+@st.cache_resource
+def get_history_store():
+    return HistoryStore()
+
+history_store = get_history_store()
+reuse_archived = st.checkbox("Reuse archived result for identical inputs", value=True, help="Skips all LLM calls when this exact description, stack and image were already evaluated")
+
 if st.button("EXECUTE EVALUATION 🚀", type="primary"):
     if not groq_key:
         st.error("MISSING CREDENTIALS")
@@ -249,13 +266,40 @@ if st.button("EXECUTE EVALUATION 🚀", type="primary"):
         st.warning("INSUFFICIENT DATA")
     else:
         try:
-            with st.spinner("🧠 ANALYZING PROJECT..."):
-                evaluator = get_evaluator(groq_key)
-                results = evaluator.audit_project(project_desc, tech_stack, image_path)
-                
-                # Cleanup temp image
-                if image_path and os.path.exists(image_path):
-                    os.remove(image_path)
+            results = None
+            if reuse_archived:
+                results = history_store.find_by_inputs(project_desc, tech_stack, image_paths, event=event_name, config=eval_config)
+
+            if results:
+                st.info("📦 LOADED FROM ARCHIVE — NO RE-EVALUATION REQUIRED")
+            else:
+                with st.spinner("🧠 ANALYZING PROJECT..."):
+                    evaluator = get_evaluator(groq_key)
+                    results = evaluator.audit_project(project_desc, tech_stack, image_paths)
+                    if results.get("degraded"):
+                        st.warning("⚠️ TEXT OR DESIGN ANALYSIS FAILED — FALLBACK SCORES SHOWN, NOT ARCHIVED")
+                    if results.get("input_truncated"):
+                        st.info("✂️ INPUT TRUNCATED TO FIT THE PROMPT BUDGET (MAX_INPUT_TOKENS)")
+                    stats = evaluator.text_audit_stats
+                    st.caption(
+                        f"Text audit: {results.get('input_tokens')} input tokens this run · "
+                        f"session: {stats['calls']} calls, {stats['prompt_tokens']} input tokens, "
+                        f"{stats['parse_failures']} parse failures, {stats['truncations']} truncated"
+                    )
+
+                # Archiving is best-effort: a storage failure must not hide results already paid for
+                try:
+                    history_store.save_evaluation(
+                        results, project_desc, tech_stack, image_paths,
+                        event=event_name, project_name=project_name, config=evaluator.config
+                    )
+                except Exception as e:
+                    st.warning(f"⚠️ ARCHIVE WRITE FAILED: {e}")
+
+            # Cleanup temp images
+            for temp_path in image_paths:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
 
             # Display Results
             st.divider()
@@ -323,6 +367,11 @@ if st.button("EXECUTE EVALUATION 🚀", type="primary"):
                 st.write(results['reasoning']['general'])
                 
             with st.expander("VIEW: DESIGN_ANALYSIS"):
+                design_tiles = results.get('design_breakdown', [])
+                if len(design_tiles) > 1:
+                    tile_cols = st.columns(len(design_tiles))
+                    for i, tile_score in enumerate(design_tiles):
+                        tile_cols[i].metric(f"Screen {i+1}", f"{tile_score:.1f}/10")
                 st.write(results['reasoning']['design'])
 
             # Similarity Check
@@ -342,3 +391,81 @@ if st.button("EXECUTE EVALUATION 🚀", type="primary"):
         except Exception as e:
             st.error(f"SYSTEM ERROR: {str(e)}")
             st.exception(e)
+
+# --- EVALUATION ARCHIVE ---
+# Served entirely from the local history store; no LLM calls.
+st.divider()
+st.subheader("🏆 EVALUATION_ARCHIVE")
+
+archive_events = history_store.events()
+arc_col1, arc_col2, arc_col3 = st.columns([2, 1, 1])
+with arc_col1:
+    archive_event = st.selectbox("Event", ["ALL"] + archive_events)
+with arc_col2:
+    archive_view = st.radio("View", ["Leaderboard", "History"], horizontal=True)
+with arc_col3:
+    page_size = st.selectbox("Rows", [25, 50, 100])
+
+with st.expander("⚖️ RE-WEIGHT SCORES"):
+    st.caption(
+        "Recomputes totals in both views from archived sub-scores. No re-evaluation, no API calls. "
+        "Weights are relative: each group is normalized to sum to 1 (e.g. all sliders at 0.5 "
+        "weigh equally), so totals stay on the 0-10 scale."
+    )
+    weight_labels = {"S_nov": "Novelty", "S_tech": "Tech", "S_imp": "Impact", "S_via": "Viability", "S_ai": "AI", "S_des": "Design"}
+    weight_cols = st.columns(len(METRIC_KEYS))
+    weights = {
+        key: weight_cols[i].slider(weight_labels[key], 0.0, 1.0, DEFAULT_WEIGHTS[key], 0.05, key=f"w_{key}")
+        for i, key in enumerate(METRIC_KEYS)
+    }
+    ai_weight_labels = {"I_rag": "RAG", "I_agent": "Agent", "I_ft": "Fine-Tuning", "I_safety": "Safety"}
+    ai_weight_cols = st.columns(len(AI_KEYS))
+    ai_weights = {
+        key: ai_weight_cols[i].slider(f"AI: {ai_weight_labels[key]}", 0.0, 1.0, DEFAULT_AI_WEIGHTS[key], 0.05, key=f"w_{key}")
+        for i, key in enumerate(AI_KEYS)
+    }
+    custom_weights = weights != DEFAULT_WEIGHTS or ai_weights != DEFAULT_AI_WEIGHTS
+    if custom_weights and (sum(weights.values()) == 0 or sum(ai_weights.values()) == 0):
+        st.warning("At least one weight in each group must be positive. Using default weights.")
+        custom_weights = False
+
+@st.cache_data
+def load_score_matrix(event_filter, total_rows):
+    # total_rows is part of the cache key so new evaluations invalidate the matrix
+    return ScoreMatrix.from_rows(history_store.score_rows(event_filter))
+
+event_filter = None if archive_event == "ALL" else archive_event
+total_rows = history_store.count(event_filter)
+if total_rows:
+    total_pages = (total_rows + page_size - 1) // page_size
+    page = st.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages, value=1)
+    if archive_view == "Leaderboard" and custom_weights:
+        score_matrix = load_score_matrix(event_filter, total_rows)
+        order, totals = score_matrix.rank(weights, ai_weights)
+        page_order = order[(page - 1) * page_size : page * page_size]
+        page_ids = [int(score_matrix.ids[i]) for i in page_order]
+        rows_by_id = {row["id"]: row for row in history_store.summaries(page_ids)}
+        rows = []
+        for i, row_id in zip(page_order, page_ids):
+            row = dict(rows_by_id[row_id])
+            # Same precision as the stored S_total
+            row["s_total"] = round(float(totals[i]), 1)
+            rows.append(row)
+    elif archive_view == "Leaderboard":
+        rows = history_store.leaderboard(event_filter, page=page, page_size=page_size)
+    else:
+        rows = history_store.history(event_filter, page=page, page_size=page_size)
+        if custom_weights:
+            # History keeps its chronological order; only the page's totals are recomputed
+            page_totals = ScoreMatrix.from_rows(rows).totals(weights, ai_weights)
+            for row, total in zip(rows, page_totals):
+                row["s_total"] = round(float(total), 1)
+
+    archive_df = pd.DataFrame(rows)
+    archive_df["created_at"] = pd.to_datetime(archive_df["created_at"], unit="s").dt.strftime("%Y-%m-%d %H:%M")
+    if archive_view == "Leaderboard":
+        archive_df.insert(0, "rank", range((page - 1) * page_size + 1, (page - 1) * page_size + 1 + len(archive_df)))
+    st.dataframe(archive_df, use_container_width=True, hide_index=True)
+    st.caption(f"{total_rows} archived evaluations")
+else:
+    st.write("NO ARCHIVED EVALUATIONS.")
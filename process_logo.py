@@ -1,25 +1,22 @@
 
+import os
+import sys
+
 import PIL.Image
 import PIL.ImageFilter
-import numpy as np
+
+# Add backend to path to allow imports
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+from image_pipeline import load_image, cover_crop
 
 def process_logo(input_path, output_path, target_size=(1500, 1000)):
     # Load image
-    img = PIL.Image.open(input_path).convert("RGBA")
-    
-    # Create target canvas
-    canvas = PIL.Image.new("RGBA", target_size)
+    img = load_image(input_path, mode="RGBA")
     
     # Strategy: Blur fill background
-    # Resize original to cover the whole canvas (aspect fill)
-    bg_scale = max(target_size[0] / img.width, target_size[1] / img.height)
-    bg_new_size = (int(img.width * bg_scale), int(img.height * bg_scale))
-    bg_img = img.resize(bg_new_size, PIL.Image.Resampling.LANCZOS)
-    
-    # Center crop background
-    left = (bg_img.width - target_size[0]) // 2
-    top = (bg_img.height - target_size[1]) // 2
-    bg_img = bg_img.crop((left, top, left + target_size[0], top + target_size[1]))
+    # Resize original to cover the whole canvas (aspect fill) and center crop
+    bg_img = cover_crop(img, target_size)
     
     # Heavy blur and darken for background
     bg_img = bg_img.filter(PIL.ImageFilter.GaussianBlur(radius=50))